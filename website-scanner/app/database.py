@@ -6,6 +6,8 @@ from .core.config import settings
 import logging
 import redis
 import json
+import hashlib
+import inspect
 from contextlib import contextmanager
 from functools import lru_cache
 import asyncio
@@ -15,11 +17,28 @@ class CacheKeys(Enum):
     """Redis缓存键枚举"""
     WEBSITE_INFO = "website:info:{domain}"
     SCAN_RESULT = "scan:result:{domain}:{timestamp}"
+    BEIAN_INFO = "beian:info:{domain}"
     SCAN_QUEUE = "scan:queue"
     SCAN_STATS = "scan:stats:{date}"
     MEMORY_USAGE = "system:memory"
     ACTIVE_SCANS = "scan:active"
 
+# 缓存键格式化结果缓存（域名基数有限，避免热路径上重复解析格式串）
+@lru_cache(maxsize=10000)
+def website_info_key(domain: str) -> str:
+    """网站信息缓存键"""
+    return CacheKeys.WEBSITE_INFO.value.format(domain=domain)
+
+@lru_cache(maxsize=10000)
+def scan_key(domain: str, timestamp: str = "latest") -> str:
+    """扫描结果缓存键"""
+    return CacheKeys.SCAN_RESULT.value.format(domain=domain, timestamp=timestamp)
+
+@lru_cache(maxsize=10000)
+def beian_key(domain: str) -> str:
+    """备案信息缓存键"""
+    return CacheKeys.BEIAN_INFO.value.format(domain=domain)
+
 logger = logging.getLogger(__name__)
 
 # 数据库配置
@@ -160,16 +179,29 @@ class RedisMemoryManager:
                 await self.redis.flushdb()
                 logger.warning("已清空所有Redis数据")
 
+def build_cache_key(key_prefix: str, func_name: str, args: tuple, kwargs: dict) -> str:
+    """
+    生成缓存键（使用blake2b而非受PYTHONHASHSEED影响的内置hash()）
+    
+    只有参数的repr跨进程稳定时键才稳定；方法调用需由调用方去掉self/cls再传入args
+    """
+    digest = hashlib.blake2b(f"{args!r}{kwargs!r}".encode("utf-8"), digest_size=16).hexdigest()
+    return f"{key_prefix}:{func_name}:{digest}"
+
 # 缓存装饰器
 def cache_result(ttl: int = 3600, key_prefix: str = ""):
     """缓存装饰器"""
     def decorator(func):
+        # 方法的self/cls的repr含内存地址，不参与缓存键，使不同实例、不同进程共享缓存
+        first_param = next(iter(inspect.signature(func).parameters), None)
+        skip_first = first_param in ("self", "cls")
+        
         def wrapper(*args, **kwargs):
             if redis_client is None:
                 return func(*args, **kwargs)
             
             # 生成缓存键
-            cache_key = f"{key_prefix}:{func.__name__}:{hash(str(args) + str(kwargs))}"
+            cache_key = build_cache_key(key_prefix, func.__name__, args[1:] if skip_first else args, kwargs)
             
             # 尝试从缓存获取
             cached_result = redis_client.get(cache_key)
@@ -1,13 +1,25 @@
+import aiohttp
 import requests
+from requests.adapters import HTTPAdapter
 import re
+import copy
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 文本检测结果缓存的最大条目数
+TEXT_RESULT_CACHE_SIZE = 256
+
 class ContentCheckerService:
-    def __init__(self):
+    def __init__(self, api_key: Optional[str] = None):
+        # 调用方传入的服务密钥（ScanService等沿用此参数；各审核API仍使用下方独立配置）
+        self.api_key = api_key
+        
         # 百度AI内容审核API配置
         self.baidu_api_key = getattr(settings, "BAIDU_API_KEY", "")
         self.baidu_secret_key = getattr(settings, "BAIDU_SECRET_KEY", "")
@@ -27,15 +39,29 @@ class ContentCheckerService:
             "political": ["反动", "颠覆", "政治敏感", "非法组织", "颠覆国家政权"]
         }
         
+        # 复用连接池的HTTP会话，避免每次API调用重新握手
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=3)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # 文本检测结果LRU缓存（相同文本不重复调用审核API）
+        self._text_result_cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._text_result_cache_lock = threading.Lock()
+        
         # 初始化百度AI访问令牌
         if self.baidu_api_key and self.baidu_secret_key:
             self._init_baidu_token()
 
+    def close(self):
+        """关闭HTTP会话，释放连接池"""
+        self.session.close()
+
     def _init_baidu_token(self):
         """初始化百度AI访问令牌"""
         try:
             url = f"https://aip.baidubce.com/oauth/2.0/token?grant_type=client_credentials&client_id={self.baidu_api_key}&client_secret={self.baidu_secret_key}"
-            response = requests.post(url, timeout=10)
+            response = self.session.post(url, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 self.baidu_access_token = data.get("access_token")
@@ -91,6 +117,26 @@ class ContentCheckerService:
             return self._create_fallback_result(text, images, str(e))
 
     def _check_text(self, text: str) -> Dict:
+        """文本内容检测（按内容缓存结果，返回深拷贝，调用方修改结果不会影响缓存）"""
+        with self._text_result_cache_lock:
+            cached = self._text_result_cache.get(text)
+            if cached is not None:
+                self._text_result_cache.move_to_end(text)
+                return copy.deepcopy(cached)
+        
+        result = self._check_text_uncached(text)
+        
+        # 配置了API但调用失败时的降级结果不缓存，下次仍重试API
+        api_configured = bool(self.baidu_access_token or self.aliyun_access_key)
+        if not (api_configured and result.get("method") == "local_detection"):
+            with self._text_result_cache_lock:
+                self._text_result_cache[text] = result
+                if len(self._text_result_cache) > TEXT_RESULT_CACHE_SIZE:
+                    self._text_result_cache.popitem(last=False)
+        
+        return copy.deepcopy(result)
+
+    def _check_text_uncached(self, text: str) -> Dict:
         """文本内容检测（优先使用百度AI，失败时使用本地检测）"""
         # 1. 尝试百度AI API
         if self.baidu_access_token:
@@ -107,6 +153,40 @@ class ContentCheckerService:
         # 3. 降级到本地检测
         return self._local_text_check(text, "所有API调用失败")
 
+    def _check_text_batch(self, texts: List[str]) -> List[Dict]:
+        """
+        批量文本内容检测
+        
+        相同文本只检测一次；配置了远程API时并发请求，结果顺序与输入一致。
+        
+        Args:
+            texts: 文本内容列表
+            
+        Returns:
+            与输入一一对应的检测结果列表
+        """
+        unique_texts = list(dict.fromkeys(texts))
+        if not unique_texts:
+            return []
+        
+        if self.baidu_access_token or self.aliyun_access_key:
+            with ThreadPoolExecutor(max_workers=min(8, len(unique_texts))) as executor:
+                unique_results = list(executor.map(self._check_text, unique_texts))
+        else:
+            unique_results = [self._check_text(text) for text in unique_texts]
+        
+        results = dict(zip(unique_texts, unique_results))
+        # 重复文本返回独立副本，避免调用方修改一处影响其他位置
+        seen = set()
+        batch_results = []
+        for text in texts:
+            if text in seen:
+                batch_results.append(copy.deepcopy(results[text]))
+            else:
+                seen.add(text)
+                batch_results.append(results[text])
+        return batch_results
+
     def _check_text_baidu(self, text: str) -> Optional[Dict]:
         """使用百度AI检测文本"""
         try:
@@ -119,22 +199,9 @@ class ContentCheckerService:
                 "text": text[:1000]  # 限制文本长度
             }
             
-            response = requests.post(url, data=payload, timeout=10)
+            response = self.session.post(url, data=payload, timeout=10)
             if response.status_code == 200:
-                data = response.json()
-                
-                # 解析百度AI响应
-                if "conclusion" in data:
-                    conclusion = data["conclusion"]
-                    is_compliant = conclusion in ["合规", "疑似", "审核中"]
-                    
-                    return {
-                        "compliant": is_compliant,
-                        "method": "baidu_ai",
-                        "confidence": 0.9,
-                        "raw_response": data,
-                        "violations": [] if is_compliant else [{"type": "baidu_detected", "confidence": 0.9}]
-                    }
+                return self._parse_baidu_response(response.json())
             
             return None
             
@@ -167,6 +234,41 @@ class ContentCheckerService:
         # 2. 降级到本地检测
         return self._local_image_check(image_url, "图片检测API调用失败")
 
+    async def acheck_image(self, image_url: str, session: Optional[aiohttp.ClientSession] = None) -> Dict:
+        """图片内容检测（异步版本，可传入共享的aiohttp会话以便并发检测多张图片）"""
+        # 1. 尝试百度AI API
+        if self.baidu_access_token:
+            result = await self._check_image_baidu_async(image_url, session)
+            if result:
+                return result
+        
+        # 2. 降级到本地检测
+        return self._local_image_check(image_url, "图片检测API调用失败")
+
+    async def _check_image_baidu_async(self, image_url: str, session: Optional[aiohttp.ClientSession] = None) -> Optional[Dict]:
+        """使用百度AI检测图片（异步版本）"""
+        if session is None:
+            async with aiohttp.ClientSession() as own_session:
+                return await self._check_image_baidu_async(image_url, own_session)
+        
+        try:
+            url = f"https://aip.baidubce.com/rest/2.0/solution/v1/img_censor/v2/user_defined?access_token={self.baidu_access_token}"
+            
+            async with session.post(
+                url,
+                data={"imgUrl": image_url},
+                timeout=aiohttp.ClientTimeout(total=15)
+            ) as response:
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                    return self._parse_baidu_response(data)
+            
+            return None
+            
+        except Exception as e:
+            logger.error(f"百度AI图片检测失败: {e}")
+            return None
+
     def _check_image_baidu(self, image_url: str) -> Optional[Dict]:
         """使用百度AI检测图片"""
         try:
@@ -179,22 +281,9 @@ class ContentCheckerService:
                 "imgUrl": image_url
             }
             
-            response = requests.post(url, data=payload, timeout=15)
+            response = self.session.post(url, data=payload, timeout=15)
             if response.status_code == 200:
-                data = response.json()
-                
-                # 解析百度AI响应
-                if "conclusion" in data:
-                    conclusion = data["conclusion"]
-                    is_compliant = conclusion in ["合规", "疑似", "审核中"]
-                    
-                    return {
-                        "compliant": is_compliant,
-                        "method": "baidu_ai",
-                        "confidence": 0.9,
-                        "raw_response": data,
-                        "violations": [] if is_compliant else [{"type": "baidu_detected", "confidence": 0.9}]
-                    }
+                return self._parse_baidu_response(response.json())
             
             return None
             
@@ -202,6 +291,22 @@ class ContentCheckerService:
             logger.error(f"百度AI图片检测失败: {e}")
             return None
 
+    def _parse_baidu_response(self, data: Dict) -> Optional[Dict]:
+        """解析百度AI审核响应"""
+        if "conclusion" not in data:
+            return None
+        
+        conclusion = data["conclusion"]
+        is_compliant = conclusion in ["合规", "疑似", "审核中"]
+        
+        return {
+            "compliant": is_compliant,
+            "method": "baidu_ai",
+            "confidence": 0.9,
+            "raw_response": data,
+            "violations": [] if is_compliant else [{"type": "baidu_detected", "confidence": 0.9}]
+        }
+
     def _local_text_check(self, text: str, error_msg: str) -> Dict:
         """本地文本内容检测（降级策略）"""
         detected_violations = []
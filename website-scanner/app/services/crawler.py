@@ -8,6 +8,8 @@ import logging
 import asyncio
 import psutil
 import gc
+import atexit
+import threading
 from typing import Optional, Dict, List
 from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 from concurrent.futures import ThreadPoolExecutor
@@ -21,6 +23,99 @@ from ..core.config import settings, get_crawler_config, get_browser_config
 # 配置日志
 logger = logging.getLogger(__name__)
 
+# 浏览器启动参数
+_BROWSER_ARGS = [
+    '--no-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-gpu',
+    '--disable-web-security',
+    '--disable-features=VizDisplayCompositor',
+    '--disable-blink-features=AutomationControlled',
+    '--disable-extensions',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding',
+    '--memory-pressure-off',  # 减少内存压力
+    '--max_old_space_size=512',  # 限制V8内存使用
+    '--disable-javascript',  # 可选：禁用JS减少内存
+    '--disable-images',  # 可选：禁用图片加载
+    '--disable-css'  # 可选：禁用CSS
+]
+
+# 爬取时不下载的资源类型：文本提取和图片URL收集都只依赖DOM，不需要这些资源的响应体
+_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
+
+
+async def _block_heavy_resources(route):
+    """拦截图片、媒体和字体请求，其余请求照常放行"""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# 同步接口共用的后台事件循环，以及运行在其上的共享浏览器
+# （Playwright对象绑定创建时的事件循环，只有固定的循环才能跨调用复用浏览器）
+_shared_loop: Optional[asyncio.AbstractEventLoop] = None
+_shared_loop_lock = threading.Lock()
+_shared_playwright = None
+_shared_browser = None
+_shared_browser_lock: Optional[asyncio.Lock] = None
+
+
+def _get_shared_loop() -> asyncio.AbstractEventLoop:
+    """获取后台事件循环（首次调用时启动）"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="crawler-event-loop", daemon=True).start()
+            _shared_loop = loop
+        return _shared_loop
+
+
+def _run_in_shared_loop(coro):
+    """在后台事件循环中执行协程并等待结果（可从任意线程调用）"""
+    return asyncio.run_coroutine_threadsafe(coro, _get_shared_loop()).result()
+
+
+async def _get_shared_browser(headless: bool):
+    """获取共享浏览器实例（只能在后台事件循环中调用）"""
+    global _shared_playwright, _shared_browser, _shared_browser_lock
+    if _shared_browser_lock is None:
+        _shared_browser_lock = asyncio.Lock()
+    
+    async with _shared_browser_lock:
+        if _shared_browser is None or not _shared_browser.is_connected():
+            if _shared_playwright is None:
+                _shared_playwright = await async_playwright().start()
+            _shared_browser = await _shared_playwright.chromium.launch(headless=headless, args=_BROWSER_ARGS)
+            logger.info("共享浏览器启动成功")
+        return _shared_browser
+
+
+async def _close_shared_browser():
+    """关闭共享浏览器"""
+    global _shared_playwright, _shared_browser
+    if _shared_browser is not None:
+        await _shared_browser.close()
+        _shared_browser = None
+    if _shared_playwright is not None:
+        await _shared_playwright.stop()
+        _shared_playwright = None
+
+
+@atexit.register
+def _shutdown_shared_loop():
+    """进程退出时关闭共享浏览器并停止后台事件循环"""
+    if _shared_loop is None or not _shared_loop.is_running():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_close_shared_browser(), _shared_loop).result(timeout=10)
+    except Exception as e:
+        logger.warning(f"共享浏览器关闭失败: {e}")
+    _shared_loop.call_soon_threadsafe(_shared_loop.stop)
+
 class MemoryManager:
     """内存管理器 - OOM防护"""
     
@@ -65,35 +160,47 @@ class AsyncCrawlerService:
         self.browser_pool = []  # 浏览器实例池
         self.browser_pool_lock = asyncio.Lock()
     
+    def close(self):
+        """释放线程池资源"""
+        self.executor.shutdown(wait=False)
+    
     @asynccontextmanager
     async def get_browser_instance(self):
-        """获取浏览器实例（带内存管理）"""
+        """
+        获取浏览器实例（带内存管理）
+        
+        在后台事件循环中复用共享浏览器，每次只创建轻量的浏览器上下文；
+        在其他事件循环中直接使用时仍独立启动浏览器。
+        """
         # 检查内存使用
         if not self.memory_manager.check_memory_safe():
             await self.memory_manager.wait_for_memory()
         
+        if asyncio.get_running_loop() is _shared_loop:
+            context = None
+            try:
+                browser = await _get_shared_browser(self.browser_config["headless"])
+                context = await browser.new_context()
+                yield context
+            except Exception as e:
+                logger.error(f"浏览器启动失败: {e}")
+                raise
+            finally:
+                if context:
+                    try:
+                        await context.close()
+                    except Exception as e:
+                        logger.warning(f"浏览器上下文关闭失败: {e}")
+                # 强制垃圾回收
+                self.memory_manager.force_gc()
+            return
+        
         browser = None
         try:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(
                     headless=self.browser_config["headless"],
-                    args=[
-                        '--no-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-gpu',
-                        '--disable-web-security',
-                        '--disable-features=VizDisplayCompositor',
-                        '--disable-blink-features=AutomationControlled',
-                        '--disable-extensions',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-renderer-backgrounding',
-                        '--memory-pressure-off',  # 减少内存压力
-                        '--max_old_space_size=512',  # 限制V8内存使用
-                        '--disable-javascript',  # 可选：禁用JS减少内存
-                        '--disable-images',  # 可选：禁用图片加载
-                        '--disable-css'  # 可选：禁用CSS
-                    ]
+                    args=_BROWSER_ARGS
                 )
                 yield browser
         except Exception as e:
@@ -122,6 +229,7 @@ class AsyncCrawlerService:
                     
                     async with self.get_browser_instance() as browser:
                         page = await browser.new_page()
+                        await page.route("**/*", _block_heavy_resources)
                         
                         # 设置视口和用户代理
                         await page.set_viewport_size(self.browser_config["viewport_size"])
@@ -352,6 +460,7 @@ class AsyncCrawlerService:
             async with async_playwright() as p:
                 browser = await p.chromium.launch(headless=True)
                 page = await browser.new_page()
+                await page.route("**/*", _block_heavy_resources)
                 
                 try:
                     url = f"https://{domain}" if not domain.startswith(('http://', 'https://')) else domain
@@ -389,10 +498,18 @@ class CrawlerService:
         self.retry_count = retry_count
         self.async_crawler = AsyncCrawlerService()
     
+    def close(self):
+        """释放底层异步爬虫资源"""
+        self.async_crawler.close()
+    
     def crawl_website(self, domain: str, max_pages: int = 10) -> Optional[Dict]:
         """同步爬取网站内容（调用异步版本）"""
-        return asyncio.run(self.async_crawler.crawl_website(domain, max_pages))
+        return _run_in_shared_loop(self.async_crawler.crawl_website(domain, max_pages))
+    
+    def crawl_websites_batch(self, domains: List[str]) -> List[Dict]:
+        """同步并发爬取多个网站（调用异步版本）"""
+        return _run_in_shared_loop(self.async_crawler.crawl_websites_batch(domains))
     
     def crawl_with_fallback(self, domain: str) -> Optional[Dict]:
         """同步降级爬取（调用异步版本）"""
-        return asyncio.run(self.async_crawler.crawl_with_fallback(domain))
\ No newline at end of file
+        return _run_in_shared_loop(self.async_crawler.crawl_with_fallback(domain))
\ No newline at end of file
@@ -8,7 +8,14 @@ class ScanService:
     def __init__(self, api_key: str, db_url: str = "mongodb://localhost:27017/"):
         self.crawler = CrawlerService()
         self.content_checker = ContentCheckerService(api_key=api_key)
-        self.db = MongoClient(db_url)["compliance"]
+        self.client = MongoClient(db_url)
+        self.db = self.client["compliance"]
+
+    def close(self):
+        """释放爬虫、内容检测和数据库连接"""
+        self.crawler.close()
+        self.content_checker.close()
+        self.client.close()
 
     def check_compliance(self, domain: str) -> Dict:
         """检测网站合规性"""
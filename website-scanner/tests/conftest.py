@@ -1,13 +1,31 @@
 import pytest
 import os
+import socket
+import logging
+import orjson
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 
+# 测试数据（与压测等非pytest工具共享同一份数据文件）
+_DATA = orjson.loads((Path(__file__).parent / "fixtures" / "data.json").read_bytes())
+_REAL_DOMAINS = tuple(w["domain"] for w in _DATA["real_websites"])
+_VIOLATION_DOMAINS = tuple(w["domain"] for w in _DATA["violation_websites"])
+
+# 测试库地址，与tests/README.md中的测试容器端口一致
+_TEST_MONGODB_URL = "mongodb://localhost:27018/test_scanner"
+_TEST_ENV = {
+    "TESTING": "1",
+    "MONGODB_URL": _TEST_MONGODB_URL,
+    "DEBUG": "true",
+}
+
+
 @pytest.fixture(scope="session")
 def test_settings():
     """测试环境配置"""
     return {
-        "MONGODB_URL": "mongodb://localhost:27017/test_scanner",
+        "MONGODB_URL": _TEST_MONGODB_URL,
         "DEBUG": True,
         "ENVIRONMENT": "testing",
         "LOG_LEVEL": "DEBUG",
@@ -16,113 +34,83 @@ def test_settings():
     }
 
 
+logger = logging.getLogger(__name__)
+
+
+@pytest.fixture(scope="session")
+def crawler_service(request):
+    """创建爬虫服务（整个测试会话共享）"""
+    from app.services.crawler import CrawlerService
+    
+    logger.info("[SETUP] 创建爬虫服务 (超时: 30s, 重试: 2次)")
+    service = CrawlerService(timeout=30000, retry_count=2)
+    request.addfinalizer(service.close)
+    return service
+
+
+@pytest.fixture(scope="session")
+def crawled(crawler_service):
+    """按域名缓存爬取结果，同一会话内重复爬取同一网站只访问一次"""
+    cache = {}
+    
+    def _get(domain):
+        if domain not in cache:
+            cache[domain] = crawler_service.crawl_website(domain)
+        return cache[domain]
+    
+    return _get
+
+
+@pytest.fixture(scope="session")
+def scan_service(request):
+    """创建扫描服务（整个测试会话共享）"""
+    from app.services.scan_service import ScanService
+    
+    logger.info("[SETUP] 创建扫描服务...")
+    service = ScanService(api_key="test_key")
+    request.addfinalizer(service.close)
+    return service
+
+
+@pytest.fixture(scope="session")
+def content_checker(request):
+    """创建内容检测服务（整个测试会话共享）"""
+    from app.services.content_checker import ContentCheckerService
+    
+    logger.info("[SETUP] 创建内容检测服务...")
+    service = ContentCheckerService(api_key="test_key")
+    request.addfinalizer(service.close)
+    return service
+
+
 @pytest.fixture
 def real_website_list():
     """真实网站列表用于测试"""
-    return [
-        {
-            "domain": "bing.com",
-            "description": "示例网站",
-            "expected_compliant": True
-        },
-        {
-            "domain": "httpbin.org", 
-            "description": "HTTP测试服务",
-            "expected_compliant": True
-        },
-        {
-            "domain": "jsonplaceholder.typicode.com",
-            "description": "API测试服务", 
-            "expected_compliant": True
-        },
-        {
-            "domain": "github.com",
-            "description": "GitHub",
-            "expected_compliant": True
-        },
-        {
-            "domain": "stackoverflow.com",
-            "description": "Stack Overflow",
-            "expected_compliant": True
-        }
-    ]
-
+    return _DATA["real_websites"]
 
 
 @pytest.fixture
 def violation_website_list():
     """违规网站列表用于测试"""
-    return [
-        {
-            "domain": "example-violation-gambling.com",
-            "description": "模拟赌博网站",
-            "expected_compliant": False,
-            "violation_type": "gambling",
-            "test_content": "在线赌博 博彩 赌场 老虎机 百家乐"
-        },
-        {
-            "domain": "example-violation-porn.com", 
-            "description": "模拟色情网站",
-            "expected_compliant": False,
-            "violation_type": "porn",
-            "test_content": "成人内容 色情 情色 裸体 性爱"
-        },
-        {
-            "domain": "example-violation-violence.com",
-            "description": "模拟暴力网站", 
-            "expected_compliant": False,
-            "violation_type": "violence",
-            "test_content": "暴力 血腥 恐怖 杀人 武器"
-        },
-        {
-            "domain": "example-violation-drugs.com",
-            "description": "模拟毒品网站",
-            "expected_compliant": False,
-            "violation_type": "drugs",
-            "test_content": "毒品 大麻 冰毒 摇头丸 可卡因"
-        },
-        {
-            "domain": "example-violation-political.com",
-            "description": "模拟政治敏感网站",
-            "expected_compliant": False,
-            "violation_type": "political",
-            "test_content": "反动 颠覆 政治敏感 非法组织"
-        }
-    ]
+    return _DATA["violation_websites"]
 
 
 @pytest.fixture
 def test_domains():
     """测试域名列表"""
-    return [
-        "bing.com",
-        "httpbin.org",
-        "jsonplaceholder.typicode.com",
-        "github.com",
-        "stackoverflow.com"
-    ]
+    return _REAL_DOMAINS
 
 
 @pytest.fixture
 def violation_test_domains():
     """违规测试域名列表"""
-    return [
-        "example-violation-gambling.com",
-        "example-violation-porn.com", 
-        "example-violation-violence.com",
-        "example-violation-drugs.com",
-        "example-violation-political.com"
-    ]
+    return _VIOLATION_DOMAINS
 
 
 @pytest.fixture
 def invalid_domains():
     """无效域名列表用于错误测试"""
-    return [
-        "this-domain-does-not-exist-12345.com",
-        "invalid-domain-test-99999.org",
-        "not-a-real-domain-xyz.com"
-    ]
+    return _DATA["invalid_domains"]
 
 
 @pytest.fixture
@@ -137,80 +125,13 @@ def sensitive_words_list():
 @pytest.fixture
 def violation_content_samples():
     """违规内容样本"""
-    return {
-        "gambling": [
-            "在线赌博网站，提供百家乐、老虎机等游戏",
-            "博彩平台，支持在线投注和实时开奖",
-            "赌场游戏，包括轮盘、扑克、骰子等"
-        ],
-        "porn": [
-            "成人内容网站，包含色情图片和视频",
-            "情色网站，提供成人娱乐内容",
-            "裸体艺术摄影作品展示"
-        ],
-        "violence": [
-            "暴力游戏网站，包含血腥和恐怖内容",
-            "武器交易平台，销售各类管制刀具",
-            "恐怖组织宣传网站"
-        ],
-        "drugs": [
-            "毒品交易网站，销售各类违禁药物",
-            "大麻种植技术交流论坛",
-            "冰毒制作方法分享平台"
-        ],
-        "political": [
-            "反动政治宣传网站",
-            "颠覆国家政权的内容",
-            "非法政治组织活动信息"
-        ]
-    }
+    return _DATA["violation_content_samples"]
 
 
 @pytest.fixture
 def mock_violation_websites():
     """模拟违规网站内容"""
-    return {
-        "example-violation-gambling.com": {
-            "text": "欢迎来到在线赌博平台！我们提供百家乐、老虎机、轮盘等多种博彩游戏。24小时在线服务，支持多种支付方式。立即注册，享受刺激的赌博体验！",
-            "images": [
-                "https://example.com/gambling1.jpg",
-                "https://example.com/gambling2.jpg"
-            ],
-            "expected_violations": ["gambling", "betting"]
-        },
-        "example-violation-porn.com": {
-            "text": "成人内容网站，提供高清色情图片和视频。包含各种成人娱乐内容，满足您的需求。18岁以上用户专用。",
-            "images": [
-                "https://example.com/porn1.jpg",
-                "https://example.com/porn2.jpg"
-            ],
-            "expected_violations": ["porn", "adult"]
-        },
-        "example-violation-violence.com": {
-            "text": "暴力游戏和武器交易平台。提供各类管制刀具、仿真枪械销售。包含血腥暴力内容，未成年人禁止访问。",
-            "images": [
-                "https://example.com/violence1.jpg",
-                "https://example.com/violence2.jpg"
-            ],
-            "expected_violations": ["violence", "weapons"]
-        },
-        "example-violation-drugs.com": {
-            "text": "毒品交易平台，销售大麻、冰毒、摇头丸等违禁药物。提供毒品制作方法和种植技术。",
-            "images": [
-                "https://example.com/drugs1.jpg",
-                "https://example.com/drugs2.jpg"
-            ],
-            "expected_violations": ["drugs", "illegal"]
-        },
-        "example-violation-political.com": {
-            "text": "政治敏感内容网站，包含反动政治宣传和颠覆国家政权的内容。非法政治组织活动信息。",
-            "images": [
-                "https://example.com/political1.jpg",
-                "https://example.com/political2.jpg"
-            ],
-            "expected_violations": ["political", "illegal"]
-        }
-    }
+    return _DATA["mock_violation_websites"]
 
 
 # 测试标记
@@ -228,9 +149,50 @@ def pytest_configure(config):
     config.addinivalue_line(
         "markers", "integration: 集成测试"
     )
-
-
-# 测试环境变量设置
-os.environ["TESTING"] = "1"
-os.environ["MONGODB_URL"] = "mongodb://localhost:27017/test_scanner"
-os.environ["DEBUG"] = "true"
\ No newline at end of file
+    
+    # 测试环境变量设置：强制覆盖外部值，会话结束时恢复
+    # 需在收集前写入，测试模块导入app时settings才会读到
+    config._saved_env = {key: os.environ.get(key) for key in _TEST_ENV}
+    os.environ.update(_TEST_ENV)
+
+
+def pytest_unconfigure(config):
+    """恢复测试前的环境变量"""
+    for key, value in getattr(config, "_saved_env", {}).items():
+        if value is None:
+            os.environ.pop(key, None)
+        else:
+            os.environ[key] = value
+
+
+def _internet_available() -> bool:
+    """快速探测外网连通性"""
+    try:
+        socket.create_connection(("1.1.1.1", 443), timeout=2).close()
+        return True
+    except OSError:
+        return False
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    调整收集到的用例：
+    - 使用benchmark fixture的用例统一加上benchmark标记；pytest-benchmark在xdist下会自动停用计时，
+      因此在xdist worker中跳过这些用例，需用 -n 0 单独运行
+    - 离线环境下统一跳过真实网站测试，避免每个用例都等待超时
+    """
+    benchmark_items = [item for item in items if "benchmark" in getattr(item, "fixturenames", ())]
+    for item in benchmark_items:
+        item.add_marker(pytest.mark.benchmark)
+    if benchmark_items and os.environ.get("PYTEST_XDIST_WORKER"):
+        skip_xdist = pytest.mark.skip(reason="pytest-benchmark在xdist下不计时，请用 -n 0 -m benchmark 单独运行")
+        for item in benchmark_items:
+            item.add_marker(skip_xdist)
+    
+    real_website_items = [item for item in items if "real_website" in item.keywords]
+    if not real_website_items or _internet_available():
+        return
+    
+    skip_offline = pytest.mark.skip(reason="无法连接外网，跳过真实网站测试")
+    for item in real_website_items:
+        item.add_marker(skip_offline)
@@ -7,11 +7,44 @@
 import pytest
 import time
 import json
+import orjson
 from unittest.mock import patch, MagicMock
-from app.database import redis_client, cache_result, CacheKeys
+from app.database import redis_client, cache_result, scan_key, beian_key, website_info_key
 from app.services.crawler import CrawlerService
 
 
+@pytest.fixture(scope="module")
+def scan_payload():
+    """扫描结果样例及其序列化结果（模块内只序列化一次）"""
+    scan_result = {
+        "domain": "example.com",
+        "text": "This is a test page content",
+        "images": [
+            "http://example.com/image1.jpg",
+            "http://example.com/image2.jpg"
+        ],
+        "url": "https://example.com",
+        "title": "Example Domain",
+        "crawl_time": time.time()
+    }
+    return scan_result, orjson.dumps(scan_result)
+
+
+@pytest.fixture(scope="module")
+def beian_payload():
+    """备案信息样例及其序列化结果（模块内只序列化一次）"""
+    beian_info = {
+        "domain": "example.com",
+        "beian_number": "京ICP备12345678号",
+        "company": "Example Company",
+        "status": "active",
+        "query_time": time.time()
+    }
+    return beian_info, orjson.dumps(beian_info)
+
+
+# 共享同一个Redis实例且会执行flushall，并行时需分配到同一个worker
+@pytest.mark.xdist_group("redis")
 class TestCache:
     """缓存测试类"""
     
@@ -19,7 +52,7 @@ class TestCache:
         """测试前设置"""
         # 清理Redis缓存
         if redis_client:
-            redis_client.flushall()
+            redis_client.flushall(asynchronous=True)
     
     def test_cache_connection(self):
         """测试缓存连接"""
@@ -70,18 +103,15 @@ class TestCache:
     def test_cache_keys(self):
         """测试缓存键设计"""
         # 测试扫描结果缓存键
-        scan_key = CacheKeys.SCAN_RESULT.format(domain="example.com")
-        assert "scan:result:example.com" in scan_key
+        assert "scan:result:example.com" in scan_key("example.com")
         
         # 测试备案信息缓存键
-        beian_key = CacheKeys.BEIAN_INFO.format(domain="example.com")
-        assert "beian:info:example.com" in beian_key
+        assert "beian:info:example.com" in beian_key("example.com")
         
         # 测试网站信息缓存键
-        website_key = CacheKeys.WEBSITE_INFO.format(domain="example.com")
-        assert "website:info:example.com" in website_key
+        assert "website:info:example.com" in website_info_key("example.com")
     
-    def test_crawler_service_cache(self):
+    def test_crawler_service_cache(self, scan_payload):
         """测试爬虫服务的缓存功能"""
         if not redis_client:
             pytest.skip("Redis未连接")
@@ -90,23 +120,17 @@ class TestCache:
         crawler_service = CrawlerService()
         
         # 测试扫描结果缓存
-        test_scan_result = {
-            "domain": "example.com",
-            "text": "test content",
-            "images": ["http://example.com/image1.jpg"],
-            "url": "https://example.com",
-            "title": "Test Page"
-        }
+        test_scan_result, blob = scan_payload
         
         # 设置缓存
-        cache_key = CacheKeys.SCAN_RESULT.format(domain="example.com")
-        redis_client.setex(cache_key, 86400, json.dumps(test_scan_result))
+        cache_key = scan_key("example.com")
+        redis_client.setex(cache_key, 86400, blob)
         
         # 验证缓存存在
         cached_result = redis_client.get(cache_key)
         assert cached_result is not None
         
-        parsed_result = json.loads(cached_result)
+        parsed_result = orjson.loads(cached_result)
         assert parsed_result["domain"] == test_scan_result["domain"]
         assert parsed_result["text"] == test_scan_result["text"]
     
@@ -165,24 +189,33 @@ class TestCache:
             pytest.skip("Redis未连接")
         
         import threading
+        import redis
         
-        def worker(thread_id):
+        # 为并发访问单独创建连接池，保证每个线程都能拿到连接而不是排队等待
+        pool = redis.BlockingConnectionPool(
+            max_connections=8,
+            timeout=5,
+            **redis_client.connection_pool.connection_kwargs
+        )
+        client = redis.Redis(connection_pool=pool)
+        
+        def worker(thread_id, client):
             """工作线程函数"""
             for i in range(100):
                 key = f"concurrent:key:{thread_id}:{i}"
                 value = f"value:{thread_id}:{i}"
                 
                 # 写入
-                redis_client.setex(key, 3600, value)
+                client.setex(key, 3600, value)
                 
                 # 读取
-                cached_value = redis_client.get(key)
+                cached_value = client.get(key)
                 assert cached_value == value
         
         # 创建多个线程
         threads = []
         for i in range(5):
-            thread = threading.Thread(target=worker, args=(i,))
+            thread = threading.Thread(target=worker, args=(i, client))
             threads.append(thread)
         
         # 启动线程
@@ -195,6 +228,7 @@ class TestCache:
             thread.join()
         
         total_time = time.time() - start_time
+        pool.disconnect()
         print(f"5个线程并发访问缓存耗时: {total_time:.3f}秒")
         assert total_time < 10.0  # 应该在10秒内完成
     
@@ -244,64 +278,84 @@ class TestCache:
         assert parsed_obj["dict"] == complex_obj["dict"]
         assert parsed_obj["none"] == complex_obj["none"]
     
-    def test_scan_result_cache(self):
+    def test_scan_result_cache(self, scan_payload):
         """测试扫描结果缓存"""
         if not redis_client:
             pytest.skip("Redis未连接")
         
         # 模拟扫描结果
-        scan_result = {
-            "domain": "example.com",
-            "text": "This is a test page content",
-            "images": [
-                "http://example.com/image1.jpg",
-                "http://example.com/image2.jpg"
-            ],
-            "url": "https://example.com",
-            "title": "Example Domain",
-            "crawl_time": time.time()
-        }
+        scan_result, blob = scan_payload
         
         # 设置缓存
-        cache_key = CacheKeys.SCAN_RESULT.format(domain="example.com")
-        redis_client.setex(cache_key, 86400, json.dumps(scan_result))
+        cache_key = scan_key("example.com")
+        redis_client.setex(cache_key, 86400, blob)
         
         # 验证缓存
         cached_result = redis_client.get(cache_key)
         assert cached_result is not None
         
-        parsed_result = json.loads(cached_result)
+        parsed_result = orjson.loads(cached_result)
         assert parsed_result["domain"] == "example.com"
         assert len(parsed_result["images"]) == 2
         assert "crawl_time" in parsed_result
     
-    def test_beian_info_cache(self):
+    def test_beian_info_cache(self, beian_payload):
         """测试备案信息缓存"""
         if not redis_client:
             pytest.skip("Redis未连接")
         
         # 模拟备案信息
-        beian_info = {
-            "domain": "example.com",
-            "beian_number": "京ICP备12345678号",
-            "company": "Example Company",
-            "status": "active",
-            "query_time": time.time()
-        }
+        beian_info, blob = beian_payload
         
         # 设置缓存
-        cache_key = CacheKeys.BEIAN_INFO.format(domain="example.com")
-        redis_client.setex(cache_key, 604800, json.dumps(beian_info))
+        cache_key = beian_key("example.com")
+        redis_client.setex(cache_key, 604800, blob)
         
         # 验证缓存
         cached_info = redis_client.get(cache_key)
         assert cached_info is not None
         
-        parsed_info = json.loads(cached_info)
+        parsed_info = orjson.loads(cached_info)
         assert parsed_info["domain"] == "example.com"
         assert parsed_info["status"] == "active"
         assert "query_time" in parsed_info
 
 
+
+class TestCacheKey:
+    """缓存键生成测试（不依赖Redis服务）"""
+    
+    def _cached_keys(self, call):
+        """执行调用并返回cache_result写入的缓存键"""
+        fake_redis = MagicMock()
+        fake_redis.get.return_value = None
+        with patch("app.database.redis_client", fake_redis):
+            call()
+        return [c.args[0] for c in fake_redis.setex.call_args_list]
+    
+    def test_method_cache_key_ignores_instance(self):
+        """测试方法的缓存键与实例无关"""
+        class Service:
+            @cache_result(ttl=60, key_prefix="test")
+            def fetch(self, domain):
+                return {"domain": domain}
+        
+        first = self._cached_keys(lambda: Service().fetch("example.com"))
+        second = self._cached_keys(lambda: Service().fetch("example.com"))
+        other = self._cached_keys(lambda: Service().fetch("example.org"))
+        
+        assert len(first) == 1
+        assert first == second
+        assert first != other
+    
+    def test_function_cache_key_uses_all_args(self):
+        """测试普通函数的缓存键包含全部参数"""
+        @cache_result(ttl=60, key_prefix="test")
+        def fetch(domain):
+            return {"domain": domain}
+        
+        assert self._cached_keys(lambda: fetch("example.com")) != self._cached_keys(lambda: fetch("example.org"))
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"]) 
\ No newline at end of file
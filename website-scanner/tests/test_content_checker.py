@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+内容检测服务测试模块
+测试文本检测结果缓存（不访问外部审核API）
+"""
+
+import pytest
+from unittest.mock import patch
+from app.services.content_checker import ContentCheckerService, TEXT_RESULT_CACHE_SIZE
+
+
+@pytest.fixture
+def checker():
+    """未配置任何审核API的内容检测服务"""
+    service = ContentCheckerService()
+    yield service
+    service.close()
+
+
+def _api_result(text):
+    """模拟审核API的检测结果"""
+    return {
+        "compliant": False,
+        "method": "baidu_ai",
+        "confidence": 0.9,
+        "raw_response": {"conclusion": "不合规", "text": text},
+        "violations": [{"type": "baidu_detected", "confidence": 0.9}]
+    }
+
+
+def _fallback_result(text):
+    """模拟API调用失败后的本地降级结果"""
+    return {"compliant": True, "method": "local_detection", "api_error": "所有API调用失败", "confidence": 0.6}
+
+
+class TestContentCheckerCache:
+    """文本检测结果缓存测试类"""
+    
+    def test_repeated_text_checked_once(self, checker):
+        """测试相同文本只检测一次"""
+        with patch.object(checker, "_check_text_uncached", side_effect=_api_result) as uncached:
+            first = checker._check_text("在线赌博网站")
+            second = checker._check_text("在线赌博网站")
+        
+        assert uncached.call_count == 1
+        assert first == second
+    
+    def test_cached_result_is_deep_copy(self, checker):
+        """测试修改返回结果不会影响缓存"""
+        with patch.object(checker, "_check_text_uncached", side_effect=_api_result):
+            first = checker._check_text("在线赌博网站")
+            first["violations"].append({"type": "mutated"})
+            first["raw_response"]["conclusion"] = "合规"
+            second = checker._check_text("在线赌博网站")
+        
+        assert second["violations"] == [{"type": "baidu_detected", "confidence": 0.9}]
+        assert second["raw_response"]["conclusion"] == "不合规"
+    
+    def test_lru_eviction(self, checker):
+        """测试超过容量时淘汰最久未使用的条目"""
+        texts = [f"内容{i}" for i in range(TEXT_RESULT_CACHE_SIZE + 1)]
+        with patch.object(checker, "_check_text_uncached", side_effect=_api_result) as uncached:
+            checker._check_text(texts[0])
+            for text in texts[1:TEXT_RESULT_CACHE_SIZE]:
+                checker._check_text(text)
+            # 访问最早的条目使其变为最近使用，随后写入新条目应淘汰texts[1]
+            checker._check_text(texts[0])
+            checker._check_text(texts[-1])
+            assert len(checker._text_result_cache) == TEXT_RESULT_CACHE_SIZE
+            
+            uncached.reset_mock()
+            checker._check_text(texts[0])
+            assert uncached.call_count == 0
+            checker._check_text(texts[1])
+            assert uncached.call_count == 1
+    
+    def test_fallback_not_cached_when_api_configured(self, checker):
+        """测试配置了API时降级结果不缓存，下次仍重试API"""
+        checker.baidu_access_token = "token"
+        with patch.object(checker, "_check_text_uncached", side_effect=_fallback_result) as uncached:
+            checker._check_text("正常内容")
+            checker._check_text("正常内容")
+        
+        assert uncached.call_count == 2
+        assert "正常内容" not in checker._text_result_cache
+    
+    def test_local_result_cached_without_api(self, checker):
+        """测试未配置API时本地检测结果正常缓存"""
+        with patch.object(checker, "_check_text_uncached", side_effect=_fallback_result) as uncached:
+            checker._check_text("正常内容")
+            checker._check_text("正常内容")
+        
+        assert uncached.call_count == 1
+    
+    def test_batch_duplicates_are_independent(self, checker):
+        """测试批量检测中重复文本的结果互不共享"""
+        with patch.object(checker, "_check_text_uncached", side_effect=_api_result) as uncached:
+            results = checker._check_text_batch(["在线赌博网站", "正常内容", "在线赌博网站"])
+        
+        assert uncached.call_count == 2
+        assert results[0] == results[2]
+        results[0]["violations"].append({"type": "mutated"})
+        assert results[2]["violations"] == [{"type": "baidu_detected", "confidence": 0.9}]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
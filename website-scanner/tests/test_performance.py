@@ -9,11 +9,35 @@ import time
 import asyncio
 import aiohttp
 import statistics
+from contextlib import contextmanager
 from unittest.mock import patch, MagicMock
-from app.database import monitor_performance, cache_result
+from sqlalchemy import text
+from app.database import monitor_performance, cache_result, build_cache_key
 from app.services.crawler import CrawlerService, AsyncCrawlerService
 
 
+HEALTH_URL = "http://localhost:8001/health"
+
+# 预构建的探活语句，避免每次调用都从字符串重新构造
+_PING = text("SELECT 1")
+
+
+def _probe(url: str, timeout: float) -> bool:
+    """探测本地服务是否可用"""
+    import requests
+    
+    try:
+        return requests.get(url, timeout=timeout).status_code == 200
+    except requests.RequestException:
+        return False
+
+
+# 收集阶段只探测一次，服务未启动时直接跳过网络测试
+_HEALTH_OK = _probe(HEALTH_URL, timeout=0.2)
+
+
+# 共享同一个Redis实例且会执行flushall，并行时需分配到同一个worker
+@pytest.mark.xdist_group("redis")
 class TestPerformance:
     """性能测试类"""
     
@@ -21,6 +45,11 @@ class TestPerformance:
         """测试前设置"""
         pass
     
+    @pytest.fixture
+    def async_crawler(self):
+        """创建异步爬虫服务"""
+        return AsyncCrawlerService()
+    
     def test_performance_monitoring_decorator(self):
         """测试性能监控装饰器"""
         @monitor_performance("test_function")
@@ -74,10 +103,9 @@ class TestPerformance:
         print(f"10次爬虫操作耗时: {total_time:.3f}秒")
         assert total_time < 5.0  # 应该在5秒内完成
     
-    async def test_async_crawler_performance(self):
+    @pytest.mark.asyncio
+    async def test_async_crawler_performance(self, async_crawler):
         """测试异步爬虫性能"""
-        async_crawler = AsyncCrawlerService()
-        
         # 测试并发爬取
         domains = [f"test{i}.example.com" for i in range(5)]
         
@@ -98,22 +126,27 @@ class TestPerformance:
         assert pool.size() <= 20  # 连接池大小
         assert pool.overflow() <= 30  # 最大溢出连接数
     
-    def test_redis_connection_performance(self):
+    def test_redis_connection_performance(self, benchmark):
         """测试Redis连接性能"""
         from app.database import redis_client
         
         if not redis_client:
             pytest.skip("Redis未连接")
         
-        # 测试连接性能
-        start_time = time.time()
-        for i in range(100):
-            redis_client.ping()
-        total_time = time.time() - start_time
+        # 预热：建立连接的握手开销不计入测量
+        redis_client.ping()
         
-        print(f"100次Redis ping耗时: {total_time:.3f}秒")
-        assert total_time < 1.0  # 应该在1秒内完成
+        def build_pipeline():
+            pipe = redis_client.pipeline(transaction=False)
+            for _ in range(100):
+                pipe.ping()
+            return (pipe,), {}
+        
+        # 测试100次ping的流水线吞吐
+        results = benchmark.pedantic(lambda pipe: pipe.execute(), setup=build_pipeline, rounds=100)
+        assert len(results) == 100
     
+    @pytest.mark.asyncio
     async def test_async_performance(self):
         """测试异步性能"""
         async def async_operation(delay):
@@ -194,42 +227,22 @@ class TestPerformance:
         assert p95_time < 0.2   # 95%的扫描应该小于200ms
         assert p99_time < 0.5   # 99%的扫描应该小于500ms
     
-    def test_concurrent_scans(self):
+    @pytest.mark.asyncio
+    async def test_concurrent_scans(self):
         """测试并发扫描处理"""
-        import threading
-        
-        results = []
-        lock = threading.Lock()
-        
-        def worker(worker_id):
-            """工作线程"""
-            start_time = time.time()
+        async def worker(worker_id):
+            """并发扫描任务"""
+            start_time = time.perf_counter()
             # 模拟扫描操作
-            time.sleep(0.05)
-            end_time = time.time()
-            
-            with lock:
-                results.append({
-                    "worker_id": worker_id,
-                    "duration": end_time - start_time
-                })
-        
-        # 创建多个线程
-        threads = []
-        for i in range(5):
-            thread = threading.Thread(target=worker, args=(i,))
-            threads.append(thread)
-        
-        # 启动所有线程
-        start_time = time.time()
-        for thread in threads:
-            thread.start()
+            await asyncio.sleep(0.05)
+            return {
+                "worker_id": worker_id,
+                "duration": time.perf_counter() - start_time
+            }
         
-        # 等待所有线程完成
-        for thread in threads:
-            thread.join()
-        
-        total_time = time.time() - start_time
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(worker(i) for i in range(5)))
+        total_time = time.perf_counter() - start_time
         
         print(f"5个并发扫描总耗时: {total_time:.3f}秒")
         assert total_time < 0.5  # 应该在500ms内完成
@@ -243,7 +256,7 @@ class TestPerformance:
             pytest.skip("Redis未连接")
         
         # 清理缓存
-        redis_client.flushall()
+        redis_client.flushall(asynchronous=True)
         
         hit_count = 0
         total_count = 0
@@ -254,7 +267,7 @@ class TestPerformance:
             total_count += 1
             
             # 检查是否从缓存获取
-            if redis_client.get(f"hit_rate_test:test_function:{hash(str(param))}"):
+            if redis_client.get(build_cache_key("hit_rate_test", "test_function", (param,), {})):
                 hit_count += 1
             
             return f"result_{param}"
@@ -281,31 +294,27 @@ class TestPerformance:
         
         # 测试数据库连接性能
         start_time = time.time()
-        with get_db() as db:
+        with contextmanager(get_db)() as db:
             # 执行简单查询
-            result = db.execute("SELECT 1")
-            result.fetchone()
+            assert db.execute(_PING).scalar() == 1
         query_time = time.time() - start_time
         
         print(f"数据库查询耗时: {query_time:.3f}秒")
         assert query_time < 0.1  # 应该在100ms内完成
     
-    def test_error_handling_performance(self):
+    def test_error_handling_performance(self, benchmark):
         """测试错误处理性能"""
         def function_with_error():
             raise ValueError("Test error")
         
-        # 测试异常处理性能
-        start_time = time.time()
-        for _ in range(1000):
+        def handle_error():
             try:
                 function_with_error()
             except ValueError:
                 pass
-        total_time = time.time() - start_time
         
-        print(f"1000次异常处理耗时: {total_time:.3f}秒")
-        assert total_time < 1.0  # 应该在1秒内完成
+        # 测试异常处理性能
+        benchmark.pedantic(handle_error, rounds=100, iterations=10)
     
     def test_playwright_performance(self):
         """测试Playwright性能"""
@@ -319,7 +328,7 @@ class TestPerformance:
         print(f"浏览器启动耗时: {browser_time:.3f}秒")
         assert browser_time < 1.0  # 应该在1秒内完成
     
-    def test_content_extraction_performance(self):
+    def test_content_extraction_performance(self, benchmark):
         """测试内容提取性能"""
         # 模拟HTML内容
         html_content = """
@@ -334,18 +343,18 @@ class TestPerformance:
         </html>
         """
         
-        # 测试内容提取性能
-        start_time = time.time()
-        for _ in range(100):
-            # 模拟内容提取
-            import re
+        import re
+        
+        def extract_content():
             text_content = re.sub(r'<[^>]+>', ' ', html_content)
             images = re.findall(r'<img[^>]+src="([^"]+)"', html_content)
+            return text_content, images
         
-        extraction_time = time.time() - start_time
-        print(f"100次内容提取耗时: {extraction_time:.3f}秒")
-        assert extraction_time < 1.0  # 应该在1秒内完成
+        # 测试内容提取性能
+        text_content, images = benchmark.pedantic(extract_content, rounds=100, iterations=10)
+        assert images == ["test1.jpg", "test2.jpg"]
     
+    @pytest.mark.skipif(not _HEALTH_OK, reason="本地服务未运行")
     def test_network_request_performance(self):
         """测试网络请求性能"""
         import requests
@@ -353,12 +362,8 @@ class TestPerformance:
         # 测试HTTP请求性能
         start_time = time.time()
         for _ in range(10):
-            try:
-                # 使用本地测试URL
-                response = requests.get("http://localhost:8001/health", timeout=1)
-                assert response.status_code == 200
-            except:
-                pass  # 忽略连接错误
+            response = requests.get(HEALTH_URL, timeout=1)
+            assert response.status_code == 200
         
         request_time = time.time() - start_time
         print(f"10次HTTP请求耗时: {request_time:.3f}秒")
@@ -6,22 +6,32 @@
 import pytest
 import time
 import logging
+import logging.handlers
+import atexit
 import os
 from pathlib import Path
-from app.services.crawler import CrawlerService
 
 # 获取当前文件所在目录
 current_dir = Path(__file__).parent
-log_file = current_dir / "real_crawler_test.log"
+# pytest-xdist并行时每个worker写独立的日志文件
+worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+log_file = current_dir / (f"real_crawler_test_{worker_id}.log" if worker_id else "real_crawler_test.log")
+
+# 文件日志先缓存在内存中批量写入，WARNING及以上级别立即刷新
+log_format = '%(asctime)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter(log_format))
+buffered_file_handler = logging.handlers.MemoryHandler(1000, flushLevel=logging.WARNING, target=file_handler)
+atexit.register(buffered_file_handler.flush)
 
 # 强制配置日志
 logging.getLogger().handlers.clear()  # 清除现有处理器
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=log_format,
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler(log_file, mode='w', encoding='utf-8')
+        buffered_file_handler
     ],
     force=True  # 强制重新配置
 )
@@ -31,31 +41,27 @@ logger = logging.getLogger(__name__)
 class TestRealCrawler:
     """真实网站爬虫测试类"""
     
-    @pytest.fixture
-    def crawler_service(self):
-        """创建爬虫服务"""
-        logger.info("[SETUP] 创建爬虫服务 (超时: 30s, 重试: 2次)")
-        return CrawlerService(timeout=30000, retry_count=2)
-    
     @pytest.mark.real_website
     @pytest.mark.slow
-    def test_real_website_crawl_basic(self, crawler_service, test_domains):
+    def test_real_website_crawl_basic(self, crawler_service):
         """测试基本真实网站爬取"""
         logger.info("[START] 开始基本真实网站爬取测试")
         
         successful_crawls = 0
-        total_tested = 0
         
         # 使用更稳定的测试网站
         stable_domains = ["bing.com", "httpbin.org", "jsonplaceholder.typicode.com"]
+        total_tested = len(stable_domains)
         
-        for domain in stable_domains:
-            logger.info(f"[PROGRESS] 进度: {total_tested + 1}/{len(stable_domains)} - 正在测试域名: {domain}")
-            total_tested += 1
-            
-            start_time = time.time()
-            result = crawler_service.crawl_website(domain)
-            end_time = time.time()
+        # 不同域名并发爬取，无需在域名之间等待
+        logger.info(f"[PROGRESS] 并发爬取 {total_tested} 个域名: {stable_domains}")
+        start_time = time.perf_counter()
+        results = crawler_service.crawl_websites_batch(stable_domains)
+        end_time = time.perf_counter()
+        
+        for item in results:
+            domain = item["domain"]
+            result = item.get("data")
             
             if result is not None and result.get("text") and len(result["text"].strip()) > 0:
                 # 验证结果
@@ -65,19 +71,14 @@ class TestRealCrawler:
                 # 验证文本内容不为空
                 assert len(result["text"].strip()) > 0, f"文本内容为空: {domain}"
                 
-                logger.info(f"[SUCCESS] {domain} 爬取成功")
-                logger.info(f"   [TIME] 爬取时间: {end_time - start_time:.2f} 秒")
-                logger.info(f"   [TEXT] 文本长度: {len(result['text'])} 字符")
-                logger.info(f"   [IMAGE] 图片数量: {len(result['images'])} 张")
+                logger.info("[SUCCESS] %s 爬取成功", domain)
+                logger.info("   [TEXT] 文本长度: %d 字符", len(result['text']))
+                logger.info("   [IMAGE] 图片数量: %d 张", len(result['images']))
                 successful_crawls += 1
             else:
-                logger.warning(f"[FAILED] {domain} 爬取失败或内容为空")
-                logger.warning(f"   [TIME] 尝试时间: {end_time - start_time:.2f} 秒")
-            
-            # 避免请求过于频繁
-            if total_tested < len(stable_domains):
-                logger.info("[WAIT] 等待 3 秒后继续...")
-                time.sleep(3)
+                logger.warning("[FAILED] %s 爬取失败或内容为空: %s", domain, item.get('error', ''))
+        
+        logger.info(f"[TIME] 并发爬取总时间: {end_time - start_time:.2f} 秒")
         
         # 要求至少有一个网站爬取成功
         success_rate = successful_crawls / total_tested
@@ -87,15 +88,15 @@ class TestRealCrawler:
     
     @pytest.mark.violation_test
     @pytest.mark.slow
-    def test_violation_content_crawl_simulation(self, crawler_service, mock_violation_websites):
+    def test_violation_content_crawl_simulation(self, mock_violation_websites):
         """测试违规内容爬取模拟"""
         logger.info("[START] 开始违规内容爬取模拟测试")
         
         # 由于违规网站域名不存在，我们模拟爬取过程
         for domain, website_data in mock_violation_websites.items():
-            logger.info(f"[VIOLATION_CRAWL] 模拟爬取违规网站: {domain}")
-            logger.info(f"   [TYPE] 违规类型: {website_data['expected_violations']}")
-            logger.info(f"   [CONTENT] 内容预览: {website_data['text'][:100]}...")
+            logger.info("[VIOLATION_CRAWL] 模拟爬取违规网站: %s", domain)
+            logger.info("   [TYPE] 违规类型: %s", website_data['expected_violations'])
+            logger.info("   [CONTENT] 内容预览: %s...", website_data['text'][:100])
             
             # 模拟爬取结果
             simulated_result = {
@@ -112,56 +113,13 @@ class TestRealCrawler:
             assert "images" in simulated_result, f"缺少图片列表: {domain}"
             assert len(simulated_result["text"]) > 0, f"文本内容为空: {domain}"
             
-            logger.info(f"   [SUCCESS] 模拟爬取成功")
-            logger.info(f"   [TEXT] 文本长度: {len(simulated_result['text'])} 字符")
-            logger.info(f"   [IMAGE] 图片数量: {len(simulated_result['images'])} 张")
-            logger.info(f"   [VIOLATION] 违规类型: {simulated_result['violation_types']}")
+            logger.info("   [SUCCESS] 模拟爬取成功")
+            logger.info("   [TEXT] 文本长度: %d 字符", len(simulated_result['text']))
+            logger.info("   [IMAGE] 图片数量: %d 张", len(simulated_result['images']))
+            logger.info("   [VIOLATION] 违规类型: %s", simulated_result['violation_types'])
         
         logger.info("[COMPLETE] 违规内容爬取模拟测试完成")
     
-    @pytest.mark.violation_test
-    @pytest.mark.slow
-    def test_violation_content_analysis(self, crawler_service, violation_content_samples):
-        """测试违规内容分析"""
-        logger.info("[START] 开始违规内容分析测试")
-        
-        total_analyzed = 0
-        violation_detected = 0
-        
-        for violation_type, content_samples in violation_content_samples.items():
-            logger.info(f"[VIOLATION_ANALYSIS] 分析违规类型: {violation_type}")
-            
-            for i, content in enumerate(content_samples, 1):
-                total_analyzed += 1
-                logger.info(f"   [CONTENT] 分析内容 {i}: {content[:50]}...")
-                
-                # 模拟内容分析过程
-                # 检查是否包含违规关键词
-                violation_keywords = {
-                    "gambling": ["赌博", "博彩", "赌场", "老虎机", "百家乐"],
-                    "porn": ["成人", "色情", "情色", "裸体", "性爱"],
-                    "violence": ["暴力", "血腥", "恐怖", "杀人", "武器"],
-                    "drugs": ["毒品", "大麻", "冰毒", "摇头丸", "可卡因"],
-                    "political": ["反动", "颠覆", "政治敏感", "非法组织"]
-                }
-                
-                keywords = violation_keywords.get(violation_type, [])
-                detected_keywords = [kw for kw in keywords if kw in content]
-                
-                if detected_keywords:
-                    violation_detected += 1
-                    logger.info(f"   [DETECTED] 检测到违规关键词: {detected_keywords}")
-                else:
-                    logger.warning(f"   [WARNING] 未检测到违规关键词")
-                
-                logger.info(f"   [RESULT] 内容长度: {len(content)} 字符")
-        
-        detection_rate = violation_detected / total_analyzed if total_analyzed > 0 else 0
-        logger.info(f"[SUMMARY] 违规内容分析完成: {violation_detected}/{total_analyzed} 检测到违规 ({detection_rate:.1%})")
-        
-        # 验证分析框架正常工作
-        assert total_analyzed > 0, "没有执行任何内容分析"
-    
     @pytest.mark.real_website
     @pytest.mark.slow
     def test_real_website_crawl_performance(self, crawler_service):
@@ -171,9 +129,9 @@ class TestRealCrawler:
         domain = "bing.com"  # 使用稳定的网站
         logger.info(f"[TARGET] 目标网站: {domain}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = crawler_service.crawl_website(domain)
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         duration = end_time - start_time
         
@@ -200,34 +158,35 @@ class TestRealCrawler:
         logger.info("[START] 开始错误处理测试")
         
         for i, domain in enumerate(invalid_domains, 1):
-            logger.info(f"[PROGRESS] 进度: {i}/{len(invalid_domains)} - 测试无效域名: {domain}")
+            logger.info("[PROGRESS] 进度: %d/%d - 测试无效域名: %s", i, len(invalid_domains), domain)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             result = crawler_service.crawl_website(domain)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             duration = end_time - start_time
             
             # 应该返回 None 或抛出异常
             if result is None:
-                logger.info(f"[SUCCESS] {domain} 正确处理了错误")
+                logger.info("[SUCCESS] %s 正确处理了错误", domain)
             else:
-                logger.warning(f"[WARNING] {domain} 返回了结果，可能需要检查错误处理")
+                logger.warning("[WARNING] %s 返回了结果，可能需要检查错误处理", domain)
             
-            logger.info(f"   [TIME] 处理时间: {duration:.2f} 秒")
+            logger.info("   [TIME] 处理时间: %.2f 秒", duration)
         
         logger.info("[COMPLETE] 错误处理测试完成")
     
     @pytest.mark.real_website
     @pytest.mark.slow
-    def test_real_website_content_quality(self, crawler_service):
+    @pytest.mark.xdist_group("bing.com")
+    def test_real_website_content_quality(self, crawled):
         """测试内容质量"""
         logger.info("[START] 开始内容质量测试")
         
         domain = "bing.com"  # 使用稳定的网站
         logger.info(f"[TARGET] 目标网站: {domain}")
         
-        result = crawler_service.crawl_website(domain)
+        result = crawled(domain)
         if result is None or not result.get("text"):
             logger.warning(f"[WARNING] 无法爬取 {domain}，跳过内容质量测试")
             pytest.skip(f"无法爬取 {domain}，跳过内容质量测试")
@@ -258,9 +217,10 @@ class TestRealCrawler:
         domain = "bing.com"
         logger.info(f"[TARGET] 目标网站: {domain}")
         
-        start_time = time.time()
+        # 计时测试需实际访问网站，不使用会话级爬取缓存
+        start_time = time.perf_counter()
         result = crawler_service.crawl_website(domain)
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         duration = end_time - start_time
         
@@ -317,19 +277,17 @@ class TestRealCrawler:
         domain = "bing.com"
         logger.info(f"[TARGET] 目标网站: {domain}")
         
-        # 连续测试3次
+        # 3次爬取并发执行，并发度由爬虫服务的信号量控制
         results = []
-        for i in range(3):
-            logger.info(f"[PROGRESS] 第 {i+1}/3 次测试...")
-            result = crawler_service.crawl_website(domain)
-            if result and result.get("text"):
-                text_length = len(result["text"])
+        for i, item in enumerate(crawler_service.crawl_websites_batch([domain] * 3), 1):
+            data = item.get("data")
+            if item["status"] == "success" and data.get("text"):
+                text_length = len(data["text"])
                 results.append(text_length)
-                logger.info(f"   [SUCCESS] 成功，文本长度: {text_length} 字符")
+                logger.info("[PROGRESS] 第 %d/3 次测试成功，文本长度: %d 字符", i, text_length)
             else:
                 results.append(0)
-                logger.info(f"   [FAILED] 失败")
-            time.sleep(2)
+                logger.info("[PROGRESS] 第 %d/3 次测试失败", i)
         
         # 计算成功率
         success_count = sum(1 for r in results if r > 0)
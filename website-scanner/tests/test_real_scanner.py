@@ -6,44 +6,56 @@
 import pytest
 import time
 import logging
+import logging.handlers
+import atexit
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from app.services.scan_service import ScanService
-from app.services.content_checker import ContentCheckerService
 
 # 获取当前文件所在目录
 current_dir = Path(__file__).parent
-log_file = current_dir / "real_scanner_test.log"
+# pytest-xdist并行时每个worker写独立的日志文件
+worker_id = os.environ.get("PYTEST_XDIST_WORKER")
+log_file = current_dir / (f"real_scanner_test_{worker_id}.log" if worker_id else "real_scanner_test.log")
+
+# 文件日志先缓存在内存中批量写入，WARNING及以上级别立即刷新
+log_format = '%(asctime)s - %(levelname)s - %(message)s'
+file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+file_handler.setFormatter(logging.Formatter(log_format))
+buffered_file_handler = logging.handlers.MemoryHandler(1000, flushLevel=logging.WARNING, target=file_handler)
+atexit.register(buffered_file_handler.flush)
 
 # 强制配置日志
 logging.getLogger().handlers.clear()  # 清除现有处理器
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=log_format,
     handlers=[
         logging.StreamHandler(),
-        logging.FileHandler(log_file, mode='w', encoding='utf-8')
+        buffered_file_handler
     ],
     force=True  # 强制重新配置
 )
 logger = logging.getLogger(__name__)
 
+# 违规关键词（按违规类型分类）
+_VIOLATION_KEYWORDS = {
+    "gambling": ["赌博", "博彩", "赌场", "老虎机", "百家乐"],
+    "porn": ["成人", "色情", "情色", "裸体", "性爱"],
+    "violence": ["暴力", "血腥", "恐怖", "杀人", "武器"],
+    "drugs": ["毒品", "大麻", "冰毒", "摇头丸", "可卡因"],
+    "political": ["反动", "颠覆", "政治敏感", "非法组织"]
+}
+
+# 全部关键词编译为一个正则，每段内容只需扫描一次；长词优先以免被短词截断
+_KW_TO_CAT = {kw: cat for cat, kws in _VIOLATION_KEYWORDS.items() for kw in kws}
+_KW_RE = re.compile("|".join(re.escape(k) for k in sorted(_KW_TO_CAT, key=len, reverse=True)))
+
 
 class TestRealScanner:
     """真实网站扫描测试类"""
     
-    @pytest.fixture
-    def scan_service(self):
-        """创建扫描服务"""
-        logger.info("🔧 创建扫描服务...")
-        return ScanService(api_key="test_key")
-    
-    @pytest.fixture
-    def content_checker(self):
-        """创建内容检测服务"""
-        logger.info("🔧 创建内容检测服务...")
-        return ContentCheckerService(api_key="test_key")
-    
     @pytest.mark.real_website
     @pytest.mark.slow
     def test_real_website_compliance_check(self, scan_service, real_website_list):
@@ -59,12 +71,12 @@ class TestRealScanner:
             description = website["description"]
             expected = website["expected_compliant"]
             
-            logger.info(f"📊 进度: {i+1}/{total_checks} - 正在检测: {domain} ({description})")
+            logger.info("📊 进度: %d/%d - 正在检测: %s (%s)", i+1, total_checks, domain, description)
             
             try:
-                start_time = time.time()
+                start_time = time.perf_counter()
                 result = scan_service.check_compliance(domain)
-                end_time = time.time()
+                end_time = time.perf_counter()
                 
                 duration = end_time - start_time
                 
@@ -72,30 +84,26 @@ class TestRealScanner:
                 assert "domain" in result, f"缺少域名信息: {domain}"
                 assert "compliant" in result, f"缺少合规状态: {domain}"
                 
-                logger.info(f"✅ {domain} 检测完成")
-                logger.info(f"   ⏱️ 检测时间: {duration:.2f} 秒")
-                logger.info(f"   📊 合规状态: {result['compliant']}")
-                logger.info(f"   🎯 预期状态: {expected}")
+                logger.info("✅ %s 检测完成", domain)
+                logger.info("   ⏱️ 检测时间: %.2f 秒", duration)
+                logger.info("   📊 合规状态: %s", result['compliant'])
+                logger.info("   🎯 预期状态: %s", expected)
                 
                 # 注意：真实网站的合规状态可能变化，这里只做基本验证
                 assert isinstance(result["compliant"], bool)
                 successful_checks += 1
                 
             except Exception as e:
-                logger.error(f"❌ {domain} 检测失败: {e}")
+                logger.error("❌ %s 检测失败: %s", domain, e)
                 # 真实网站可能偶尔失败，这是正常的
                 continue
-            
-            if i < total_checks - 1:
-                logger.info("⏳ 等待 5 秒后继续...")
-                time.sleep(5)  # 避免请求过于频繁
         
         success_rate = successful_checks / total_checks
         logger.info(f"📈 合规检测测试完成: {successful_checks}/{total_checks} 成功 ({success_rate:.1%})")
     
     @pytest.mark.violation_test
     @pytest.mark.slow
-    def test_violation_website_compliance_check(self, scan_service, violation_website_list):
+    def test_violation_website_compliance_check(self, content_checker, violation_website_list):
         """测试违规网站合规检测"""
         logger.info("🚀 开始违规网站合规检测测试")
         
@@ -109,19 +117,16 @@ class TestRealScanner:
             violation_type = website["violation_type"]
             test_content = website["test_content"]
             
-            logger.info(f"📊 进度: {i}/{total_checks} - 正在检测违规网站: {domain} ({description})")
-            logger.info(f"   🚨 违规类型: {violation_type}")
-            logger.info(f"   📝 测试内容: {test_content}")
+            logger.info("📊 进度: %d/%d - 正在检测违规网站: %s (%s)", i, total_checks, domain, description)
+            logger.info("   🚨 违规类型: %s", violation_type)
+            logger.info("   📝 测试内容: %s", test_content)
             
             try:
                 # 由于违规网站域名不存在，我们模拟检测过程
                 # 直接测试内容检测功能
-                from app.services.content_checker import ContentCheckerService
-                content_checker = ContentCheckerService(api_key="test_key")
-                
-                start_time = time.time()
+                start_time = time.perf_counter()
                 text_result = content_checker._check_text(test_content)
-                end_time = time.time()
+                end_time = time.perf_counter()
                 
                 duration = end_time - start_time
                 
@@ -135,18 +140,18 @@ class TestRealScanner:
                     "test_content": test_content
                 }
                 
-                logger.info(f"✅ {domain} 违规检测完成")
-                logger.info(f"   ⏱️ 检测时间: {duration:.2f} 秒")
-                logger.info(f"   📊 合规状态: {result['compliant']}")
-                logger.info(f"   🎯 预期状态: {expected}")
-                logger.info(f"   🚨 违规类型: {violation_type}")
+                logger.info("✅ %s 违规检测完成", domain)
+                logger.info("   ⏱️ 检测时间: %.2f 秒", duration)
+                logger.info("   📊 合规状态: %s", result['compliant'])
+                logger.info("   🎯 预期状态: %s", expected)
+                logger.info("   🚨 违规类型: %s", violation_type)
                 
                 # 验证检测结果
                 assert isinstance(result["compliant"], bool)
                 successful_checks += 1
                 
             except Exception as e:
-                logger.error(f"❌ {domain} 违规检测失败: {e}")
+                logger.error("❌ %s 违规检测失败: %s", domain, e)
                 continue
         
         success_rate = successful_checks / total_checks
@@ -160,33 +165,42 @@ class TestRealScanner:
         
         total_tests = 0
         correct_detections = 0
+        # 逐条进度日志较多，INFO关闭时整体跳过
+        verbose = logger.isEnabledFor(logging.INFO)
+        
+        # 一次性批量检测全部样本
+        all_contents = [content for content_samples in violation_content_samples.values() for content in content_samples]
+        batch_results = iter(content_checker._check_text_batch(all_contents))
         
         for violation_type, content_samples in violation_content_samples.items():
-            logger.info(f"🎯 测试违规类型: {violation_type}")
+            logger.info("🎯 测试违规类型: %s", violation_type)
             
             for i, content in enumerate(content_samples, 1):
                 total_tests += 1
-                logger.info(f"   📝 测试内容 {i}: {content[:50]}...")
+                if verbose:
+                    logger.info("   📝 测试内容 %d: %s...", i, content[:50])
+                
+                result = next(batch_results)
                 
                 try:
-                    # 检测文本内容
-                    result = content_checker._check_text(content)
                     actual_compliant = result.get("compliant", True)
                     
                     # 违规内容应该被检测为不合规
                     expected_compliant = False  # 违规内容预期为False
                     
                     if actual_compliant == expected_compliant:
-                        logger.info(f"   ✅ 检测结果正确")
                         correct_detections += 1
+                        if verbose:
+                            logger.info("   ✅ 检测结果正确")
+                            logger.info("   📊 检测结果: %s", result)
                     else:
-                        logger.warning(f"   ⚠️ 检测结果错误")
-                        logger.warning(f"   📊 实际结果: {actual_compliant}, 预期: {expected_compliant}")
-                    
-                    logger.info(f"   📊 检测结果: {result}")
+                        logger.warning("   ⚠️ 检测结果错误")
+                        logger.warning("   📊 实际结果: %s, 预期: %s", actual_compliant, expected_compliant)
+                        if verbose:
+                            logger.info("   📊 检测结果: %s", result)
                     
                 except Exception as e:
-                    logger.error(f"   ❌ 检测失败: {e}")
+                    logger.error("   ❌ 检测失败: %s", e)
         
         accuracy_rate = correct_detections / total_tests if total_tests > 0 else 0
         logger.info(f"📈 违规检测准确性测试完成: {correct_detections}/{total_tests} 正确 ({accuracy_rate:.1%})")
@@ -196,7 +210,8 @@ class TestRealScanner:
     
     @pytest.mark.real_website
     @pytest.mark.slow
-    def test_real_website_content_analysis(self, content_checker):
+    @pytest.mark.xdist_group("bing.com")
+    def test_real_website_content_analysis(self, content_checker, crawled):
         """测试真实网站内容分析"""
         logger.info("🚀 开始真实网站内容分析测试")
         
@@ -205,9 +220,7 @@ class TestRealScanner:
         
         # 先爬取网站内容
         logger.info("🕷️ 开始爬取网站内容...")
-        from app.services.crawler import CrawlerService
-        crawler = CrawlerService()
-        website_data = crawler.crawl_website(domain)
+        website_data = crawled(domain)
         
         if website_data is None:
             logger.error("❌ 爬取失败")
@@ -228,9 +241,9 @@ class TestRealScanner:
         if website_data["images"]:
             logger.info("🖼️ 开始分析图片内容...")
             for i, img_url in enumerate(website_data["images"][:2], 1):  # 只测试前2张图片
-                logger.info(f"   📸 分析图片 {i}: {img_url}")
+                logger.info("   📸 分析图片 %d: %s", i, img_url)
                 img_result = content_checker._check_image(img_url)
-                logger.info(f"   📊 图片分析结果: {img_result}")
+                logger.info("   📊 图片分析结果: %s", img_result)
         else:
             logger.info("ℹ️ 没有找到图片内容")
         
@@ -243,32 +256,57 @@ class TestRealScanner:
         logger.info("🚀 开始违规内容分析测试")
         
         total_analyzed = 0
+        keyword_detected = 0
         violation_detected = 0
+        # 逐条进度日志较多，INFO关闭时整体跳过
+        verbose = logger.isEnabledFor(logging.INFO)
+        
+        # 一次性批量检测全部样本
+        all_contents = [content for content_samples in violation_content_samples.values() for content in content_samples]
+        batch_results = iter(content_checker._check_text_batch(all_contents))
         
         for violation_type, content_samples in violation_content_samples.items():
-            logger.info(f"🎯 分析违规类型: {violation_type}")
+            logger.info("🎯 分析违规类型: %s", violation_type)
             
             for i, content in enumerate(content_samples, 1):
                 total_analyzed += 1
-                logger.info(f"   📝 分析内容 {i}: {content[:50]}...")
+                if verbose:
+                    logger.info("   📝 分析内容 %d: %s...", i, content[:50])
+                
+                # 先做本地关键词预扫描，命中首个关键词即可判定
+                hits = (
+                    match.group()
+                    for match in _KW_RE.finditer(content)
+                    if _KW_TO_CAT[match.group()] == violation_type
+                )
+                first_hit = next(hits, None)
+                if first_hit is not None:
+                    keyword_detected += 1
+                    # 仅在需要输出INFO日志时才收集完整关键词列表
+                    if verbose:
+                        logger.info("   🔑 检测到违规关键词: %s", list(dict.fromkeys([first_hit, *hits])))
+                else:
+                    logger.warning("   ⚠️ 未检测到违规关键词")
+                
+                result = next(batch_results)
                 
                 try:
-                    # 检测文本内容
-                    result = content_checker._check_text(content)
-                    
                     if result and not result.get("compliant", True):
-                        logger.info(f"   ✅ 成功检测到违规内容")
                         violation_detected += 1
+                        if verbose:
+                            logger.info("   ✅ 成功检测到违规内容")
                     else:
-                        logger.warning(f"   ⚠️ 未检测到违规内容")
+                        logger.warning("   ⚠️ 未检测到违规内容")
                     
-                    logger.info(f"   📊 检测结果: {result}")
+                    if verbose:
+                        logger.info("   📊 检测结果: %s", result)
                     
                 except Exception as e:
-                    logger.error(f"   ❌ 检测失败: {e}")
+                    logger.error("   ❌ 检测失败: %s", e)
         
         detection_rate = violation_detected / total_analyzed if total_analyzed > 0 else 0
         logger.info(f"📈 违规内容分析测试完成: {violation_detected}/{total_analyzed} 检测到违规 ({detection_rate:.1%})")
+        logger.info(f"🔑 关键词预扫描: {keyword_detected}/{total_analyzed} 命中违规关键词")
         
         # 验证分析框架正常工作
         assert total_analyzed > 0, "没有执行任何内容分析"
@@ -282,9 +320,9 @@ class TestRealScanner:
         domain = "bing.com"
         logger.info(f"🎯 目标网站: {domain}")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = scan_service.check_compliance(domain)
-        end_time = time.time()
+        end_time = time.perf_counter()
         
         duration = end_time - start_time
         
@@ -312,20 +350,20 @@ class TestRealScanner:
         logger.info("🚀 开始扫描错误处理测试")
         
         for i, domain in enumerate(invalid_domains, 1):
-            logger.info(f"📊 进度: {i}/{len(invalid_domains)} - 测试无效域名扫描: {domain}")
+            logger.info("📊 进度: %d/%d - 测试无效域名扫描: %s", i, len(invalid_domains), domain)
             
-            start_time = time.time()
+            start_time = time.perf_counter()
             result = scan_service.check_compliance(domain)
-            end_time = time.time()
+            end_time = time.perf_counter()
             
             duration = end_time - start_time
             
             if result and result.get("status") == "error":
-                logger.info(f"✅ {domain} 正确处理了扫描错误")
+                logger.info("✅ %s 正确处理了扫描错误", domain)
             else:
-                logger.warning(f"⚠️ {domain} 扫描结果异常")
+                logger.warning("⚠️ %s 扫描结果异常", domain)
             
-            logger.info(f"   ⏱️ 处理时间: {duration:.2f} 秒")
+            logger.info("   ⏱️ 处理时间: %.2f 秒", duration)
         
         logger.info("✅ 扫描错误处理测试完成")
     
@@ -369,19 +407,22 @@ class TestRealScanner:
         
         logger.info("🔄 开始并发扫描...")
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         results = []
         
-        for i, domain in enumerate(domains, 1):
-            logger.info(f"📊 进度: {i}/{len(domains)} - 扫描 {domain}")
-            try:
-                result = scan_service.check_compliance(domain)
-                results.append(result)
-                logger.info(f"   ✅ {domain} 扫描完成")
-            except Exception as e:
-                logger.error(f"   ❌ {domain} 扫描失败: {e}")
-        
-        end_time = time.time()
+        # 扫描以网络I/O为主，线程池可让各网站的等待时间相互重叠
+        with ThreadPoolExecutor(max_workers=len(domains)) as executor:
+            futures = {executor.submit(scan_service.check_compliance, domain): domain for domain in domains}
+            for future in as_completed(futures):
+                domain = futures[future]
+                error = future.exception()
+                if error is None:
+                    results.append(future.result())
+                    logger.info("   ✅ %s 扫描完成", domain)
+                else:
+                    logger.error("   ❌ %s 扫描失败: %s", domain, error)
+        
+        end_time = time.perf_counter()
         total_time = end_time - start_time
         
         logger.info(f"📈 并发扫描结果:")